@@ -1,53 +1,97 @@
+import ijson  # type: ignore[import-untyped]
 import json
+import orjson
 import yaml
-from urllib.parse import urlparse, parse_qs
-from collections import defaultdict
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YamlDumper  # type: ignore[assignment]
+from urllib.parse import ParseResult, urlparse, parse_qsl
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 import re
-from typing import List, Dict, Optional, Union
+import sys
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Set, Tuple, Union
+
+
+# Runs of 19+ digits may not fit in a 64-bit integer
+_LONG_NUMBER_RE = re.compile(r'\d{19,}')
+
+# Matches 'name=value' pairs of a Cookie header; pairs without '=' are skipped
+_COOKIE_RE = re.compile(r'\s*([^=;]+)=([^;]*)')
 
 
 class har2openapi:
     def __init__(self, filename: str, url_filter: Optional[Union[str, List[str]]] = None,
-                 cookie_filter: Optional[List[str]] = None, ignore_headers: Optional[List[str]] = None) -> None:
+                 cookie_filter: Optional[List[str]] = None, ignore_headers: Optional[List[str]] = None,
+                 json_output: bool = False, workers: int = 1) -> None:
         """
         :param filename: Path to the HAR file.
         :param url_filter: List or regular expression for filtering URLs.
         :param cookie_filter: List of cookie names to keep.
         :param ignore_headers: List of headers to ignore.
+        :param json_output: Write schemas as JSON instead of YAML (fast path, skips the YAML emitter).
+        :param workers: Number of processes used to build schemas for different base URLs. Values above 1
+            start a process pool, so the calling script needs an ``if __name__ == "__main__":`` guard.
         """
         self.filename = filename
         self.url_filter = url_filter
-        self.cookie_filter = cookie_filter
-        self.ignore_headers = ignore_headers or []
-
-    def open_file(self) -> None:
-        """Opens and loads data from the HAR file."""
-        with open(self.filename, "r", encoding='UTF-8') as f:
-            self.har_data = json.load(f)
-            self.entries = self.har_data['log']['entries']
+        # Sets give O(1) membership checks in filter_cookies() / filter_headers()
+        self.cookie_filter = frozenset(cookie_filter) if cookie_filter else None
+        self.ignore_headers = frozenset(ignore_headers or ())
+        # HTTP header names are case-insensitive
+        self._ignore_lc = frozenset(header.lower() for header in self.ignore_headers)
+        self.json_output = json_output
+        self.workers = workers
+
+        # Compile URL filters once instead of on every filter_urls() call
+        self._url_re = None
+        if isinstance(url_filter, str) and url_filter:
+            # Automatically convert a simple domain to a regular expression
+            if not url_filter.startswith("^"):
+                url_filter = rf"^https?://{re.escape(url_filter)}/.*"
+            self._url_re = re.compile(url_filter)
+        elif isinstance(url_filter, list) and url_filter:
+            # Fuse all domains into one alternation so each URL is matched in a single pass
+            domains = "|".join(re.escape(url) for url in url_filter)
+            self._url_re = re.compile(rf"^https?://(?:{domains})/.*")
+
+    def __reduce__(self) -> Tuple[type, tuple]:
+        """Pickles the converter by its constructor arguments (needed by worker processes, also under mypyc)."""
+        cookie_filter = list(self.cookie_filter) if self.cookie_filter else None
+        return (self.__class__, (self.filename, self.url_filter, cookie_filter,
+                                 list(self.ignore_headers), self.json_output, self.workers))
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Streams entries from the HAR file without loading the whole log into memory."""
+        with open(self.filename, "rb") as f:
+            # use_float keeps numbers serializable by the YAML and JSON writers (no Decimal)
+            yield from ijson.items(f, 'log.entries.item', use_float=True)
 
     def write_to_file(self, data: Dict, filename: str) -> None:
-        """Writes data to a YAML file."""
+        """Writes data to a YAML file, or to a JSON file if json_output is set."""
+        if self.json_output:
+            # Serialize before opening the file so a failure does not leave an empty file behind
+            try:
+                content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            except TypeError:
+                # orjson refuses integers wider than 64 bits, which parse_post_data() keeps exact
+                content = json.dumps(data, indent=2, ensure_ascii=False).encode('UTF-8')
+            with open(filename, "wb") as f:
+                f.write(content)
+            return
+
         with open(filename, "w", encoding='UTF-8') as f:
-            yaml.dump(data, f, default_flow_style=False)
+            yaml.dump(data, f, Dumper=YamlDumper, default_flow_style=False, sort_keys=False)
 
-    def filter_urls(self, entries: List[Dict]) -> List[Dict]:
+    def filter_urls(self, entries: Iterable[Dict]) -> Iterator[Dict]:
         """Filters URLs based on the provided filter."""
-        if not self.url_filter:
-            return entries
+        if self._url_re is None:
+            yield from entries
+            return
 
-        # Automatically convert a simple domain to a regular expression
-        if isinstance(self.url_filter, str):
-            if not self.url_filter.startswith("^"):
-                self.url_filter = rf"^https?://{re.escape(self.url_filter)}/.*"
-            regex = re.compile(self.url_filter)
-            return [entry for entry in entries if regex.search(entry['request']['url'])]
-
-        if isinstance(self.url_filter, list):
-            return [entry for entry in entries if any(
-                re.search(rf"^https?://{re.escape(url)}/.*", entry['request']['url']) for url in self.url_filter)]
-
-        return entries
+        for entry in entries:
+            if self._url_re.search(entry['request']['url']):
+                yield entry
 
     def filter_cookies(self, cookies: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """Keeps only unique cookies that match the filter."""
@@ -58,26 +102,30 @@ class har2openapi:
         unique_cookies = {cookie['name']: cookie for cookie in cookies if cookie['name'] in self.cookie_filter}
         return list(unique_cookies.values())
 
-    def filter_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
-        """Removes headers specified in the ignore_headers list."""
-        return {k: v for k, v in headers.items() if k not in self.ignore_headers}
+    def filter_headers(self, headers: Iterable[Dict[str, str]]) -> Dict[str, str]:
+        """Builds a name -> value dict from HAR headers, skipping those in ignore_headers (case-insensitive)."""
+        if not self._ignore_lc:
+            # Nothing to ignore, skip lowercasing every header name
+            return {header['name']: header['value'] for header in headers}
+        return {header['name']: header['value'] for header in headers
+                if header['name'].lower() not in self._ignore_lc}
 
     def format_cookies(self, cookies: List[Dict[str, str]]) -> str:
         """Formats cookies as 'name=value; name2=value2'."""
-        return '; '.join(f"{cookie['name']}={cookie['value']}" for cookie in cookies)
+        return '; '.join([f"{cookie['name']}={cookie['value']}" for cookie in cookies])
 
-    def generate_parameters(self, query_params: Dict[str, List[str]], headers: Dict[str, str]) -> List[Dict[str, Union[str, Dict]]]:
+    def generate_parameters(self, query_params: Dict[str, str], headers: Dict[str, str]) -> List[Dict[str, Any]]:
         """Generates query and header parameters for OpenAPI."""
         parameters = []
 
         # Add query string parameters
-        for param, values in query_params.items():
+        for param, value in query_params.items():
             parameters.append({
                 "name": param,
                 "in": "query",
                 "required": True,
                 "schema": {"type": "string"},
-                "example": values[0] if values else None
+                "example": value
             })
 
         # Add header parameters
@@ -95,23 +143,31 @@ class har2openapi:
     def parse_post_data(self, post_data: Optional[str]) -> Union[str, dict, None]:
         """Converts a string to JSON if necessary."""
         if isinstance(post_data, str):
+            # orjson turns integers wider than 64 bits into lossy floats, leave those bodies to json
+            if not _LONG_NUMBER_RE.search(post_data):
+                try:
+                    return orjson.loads(post_data)  # Convert string to JSON
+                except orjson.JSONDecodeError:
+                    pass  # json also accepts NaN/Infinity, which orjson rejects
             try:
-                return json.loads(post_data)  # Convert string to JSON
+                return json.loads(post_data)
             except json.JSONDecodeError:
                 return post_data  # Return as-is if parsing fails
         return post_data  # Return as-is if it's not a string
 
     def parse_cookie_string(self, cookie_string: str) -> List[Dict[str, str]]:
         """Parses a cookie string into a list of cookies."""
-        cookies = []
-        for cookie in cookie_string.split(';'):
-            cookie = cookie.strip()
-            if '=' in cookie:
-                name, value = cookie.split('=', 1)
-                cookies.append({'name': name, 'value': value})
-        return cookies
-
-    def generate_request_body(self, mime_type: str, body: Optional[Union[str, dict]]) -> Optional[Dict[str, dict]]:
+        return [{'name': match.group(1).strip(), 'value': match.group(2).rstrip()}
+                for match in _COOKIE_RE.finditer(cookie_string)]
+
+    def parse_status(self, entry: Dict) -> int:
+        """Returns the response status of an entry, or 200 if it is missing or invalid."""
+        status = entry['response'].get('status', 200)
+        if not isinstance(status, int) or not (100 <= status <= 599):
+            return 200
+        return status
+
+    def generate_request_body(self, mime_type: str, body: Optional[Union[str, dict]]) -> Optional[Dict[str, Any]]:
         """
         Generates the request body for OpenAPI. The body is always marked as required.
         :param mime_type: MIME type of the request body.
@@ -128,6 +184,7 @@ class har2openapi:
                     }
                 }
             }
+        return None
 
     def generate_response_body(self, mime_type: str, response_body: str) -> Optional[Dict[str, dict]]:
         """Generates the response body for OpenAPI."""
@@ -144,78 +201,137 @@ class har2openapi:
 
     def create_openapi(self) -> None:
         """Generates OpenAPI specifications from the HAR file."""
-        self.open_file()
-
-        # Filter entries by URL
-        self.entries = self.filter_urls(self.entries)
-
-        # Group entries by base URL
-        grouped_entries = defaultdict(list)
-        for entry in self.entries:
-            url = entry['request']['url']
-            base_url = urlparse(url)._replace(path='', params='', query='', fragment='').geturl()
-            grouped_entries[base_url].append(entry)
-
-        # Create an OpenAPI schema for each base URL
-        for base_url, entries in grouped_entries.items():
-            paths = {}
-            for entry in entries:
-                url = entry['request']['url']
-                parsed_url = urlparse(url)
-                method = entry['request']['method'].lower()
-                headers = {header['name']: header['value'] for header in entry['request'].get('headers', [])}
-                headers = self.filter_headers(headers)
-
-                body = entry['request'].get('postData', {}).get('text', None)
-                body = self.parse_post_data(body)
-
-                cookies = entry['request'].get('cookies', [])
-                cookie_header = headers.get('Cookie', '')
-                if cookie_header:
-                    cookies.extend(self.parse_cookie_string(cookie_header))
-                cookies = self.filter_cookies(cookies)
-
-                if cookies:
-                    headers['Cookie'] = self.format_cookies(cookies)
-
-                path = parsed_url.path
-                query_params = parse_qs(parsed_url.query)
-
-                status = entry['response'].get('status', 200)
-                if not isinstance(status, int) or not (100 <= status <= 599):
-                    status = 200
-
-                mime_type = entry['response']['content'].get('mimeType', 'text/plain')
-                response_body = entry['response']['content'].get('text', '')
-
-                if path not in paths:
-                    paths[path] = {}
-
-                if method not in paths[path]:
-                    paths[path][method] = {
-                        "summary": f"Generated operation for {url}",
-                        "parameters": self.generate_parameters(query_params, headers),
-                        "requestBody": self.generate_request_body(mime_type, body),
-                        "responses": {}
-                    }
-
-                status_str = str(status)
-                response_data = {"description": f"Response for status {status}"}
-                response_body_data = self.generate_response_body(mime_type, response_body)
-                response_data.update(response_body_data if response_body_data else {})
-
-                paths[path][method]["responses"][status_str] = response_data
-
-            openapi_schema = {
-                "openapi": "3.0.0",
-                "info": {
-                    "title": f"OpenAPI schema for {base_url}",
-                    "version": "1.0.0",
-                    "description": f"Auto-generated schema for {base_url}"
-                },
-                "servers": [{"url": base_url, "description": "Base URL from HAR file"}],
-                "paths": paths
+        # Stream entries filtered by URL and group them by base URL
+        grouped_entries: Dict[str, List[Tuple[ParseResult, Dict]]] = {}
+        # Requests already grouped, keyed by (base URL, path, method, status)
+        seen: Set[Tuple[str, str, str, int]] = set()
+        # Consecutive entries usually share a base URL, so reuse the last group instead of a dict lookup
+        last_base_url: Optional[str] = None
+        last_group: List[Tuple[ParseResult, Dict]] = []
+        for entry in self.filter_urls(self.iter_entries()):
+            # Parse each URL once and keep the result alongside its entry
+            parsed_url = urlparse(entry['request']['url'])
+            if parsed_url.netloc:
+                base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            else:
+                # data:, blob:, about: etc. have no netloc; keep their original 'scheme:' base URL
+                base_url = parsed_url._replace(path='', params='', query='', fragment='').geturl()
+
+            # Repeated requests add nothing new to the schema, drop them before they are kept in memory
+            signature = (base_url, parsed_url.path, entry['request']['method'].lower(), self.parse_status(entry))
+            if signature in seen:
+                continue
+            seen.add(signature)
+
+            if base_url != last_base_url:
+                last_group = grouped_entries.setdefault(base_url, [])
+                last_base_url = base_url
+            last_group.append((parsed_url, entry))
+
+        if self.workers > 1 and len(grouped_entries) > 1:
+            self.build_in_pool(grouped_entries)
+        else:
+            # Pop each group as it is processed so it can be released once written
+            for base_url in list(grouped_entries):
+                self.build_and_write(base_url, grouped_entries.pop(base_url))
+
+    def build_in_pool(self, grouped_entries: Dict[str, List[Tuple[ParseResult, Dict]]]) -> None:
+        """
+        Builds and writes the schemas for each base URL in worker processes.
+        At most `workers` groups are in flight at once, so pending groups are not all pickled up front.
+        :param grouped_entries: Entries grouped by base URL; groups are removed as they are submitted.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending: Set[Future] = set()
+            for base_url in list(grouped_entries):
+                if len(pending) >= self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()  # Re-raise any error from a worker
+                pending.add(executor.submit(self.build_and_write, base_url, grouped_entries.pop(base_url)))
+            for future in pending:
+                future.result()
+
+    def build_and_write(self, base_url: str, entries: List[Tuple[ParseResult, Dict]]) -> None:
+        """
+        Builds the OpenAPI schema for a single base URL and writes it to a file.
+        :param base_url: Base URL (scheme://netloc, or 'scheme:' for URLs without a host) shared by all entries.
+        :param entries: Parsed request URL and HAR entry pairs for this base URL.
+        """
+        paths: Dict[str, Dict[str, Dict]] = {}
+        for parsed_url, entry in entries:
+            self.add_entry(paths, parsed_url, entry)
+
+        openapi_schema = {
+            "openapi": "3.0.0",
+            "info": {
+                "title": f"OpenAPI schema for {base_url}",
+                "version": "1.0.0",
+                "description": f"Auto-generated schema for {base_url}"
+            },
+            "servers": [{"url": base_url, "description": "Base URL from HAR file"}],
+            "paths": paths
+        }
+
+        extension = "json" if self.json_output else "yaml"
+        # base_url is scheme://netloc or a bare 'scheme:', so '://' is the only separator to replace
+        filename = f"openapi_{base_url.replace('://', '_', 1)}.{extension}"
+        self.write_to_file(openapi_schema, filename)
+
+    def add_entry(self, paths: Dict[str, Dict[str, Dict]], parsed_url: ParseResult, entry: Dict) -> None:
+        """
+        Adds the operation and response described by a single HAR entry to paths.
+        :param paths: OpenAPI paths object being built for the entry's base URL.
+        :param parsed_url: Parsed request URL of the entry.
+        :param entry: HAR entry.
+        """
+        url: str = entry['request']['url']
+        method: str = entry['request']['method'].lower()
+        # Paths repeat across many entries; interned strings hash once and compare by identity
+        path: str = sys.intern(parsed_url.path)
+
+        status = self.parse_status(entry)
+
+        mime_type: str = entry['response']['content'].get('mimeType', 'text/plain')
+        response_body: str = entry['response']['content'].get('text', '')
+
+        if path not in paths:
+            paths[path] = {}
+
+        if method not in paths[path]:
+            # Headers, cookies, query and body only matter for the first request of an operation
+            headers = self.filter_headers(entry['request'].get('headers', ()))
+            cookie_name = next((name for name in headers if name.lower() == 'cookie'), 'Cookie')
+
+            post_data = entry['request'].get('postData', {})
+            text: Optional[str] = post_data.get('text', None)
+            # Only JSON bodies are worth decoding; form, multipart and binary data stay as-is
+            body = self.parse_post_data(text) if 'json' in post_data.get('mimeType', '') else text
+
+            cookies: List[Dict[str, str]] = entry['request'].get('cookies', [])
+            cookie_header = headers.get(cookie_name, '')
+            if cookie_header:
+                cookies.extend(self.parse_cookie_string(cookie_header))
+            cookies = self.filter_cookies(cookies)
+
+            if cookies:
+                headers[cookie_name] = self.format_cookies(cookies)
+
+            # Only the first value of a repeated query parameter is used as the example
+            query_params: Dict[str, str] = {}
+            for param, value in parse_qsl(parsed_url.query):
+                query_params.setdefault(param, value)
+
+            paths[path][method] = {
+                "summary": f"Generated operation for {url}",
+                "parameters": self.generate_parameters(query_params, headers),
+                "requestBody": self.generate_request_body(mime_type, body),
+                "responses": {}
             }
 
-            filename = f"openapi_{base_url.replace('://', '_').replace('/', '_')}.yaml"
-            self.write_to_file(openapi_schema, filename)
+        status_str = str(status)
+        response_data: Dict[str, Union[str, dict]] = {"description": f"Response for status {status}"}
+        response_body_data = self.generate_response_body(mime_type, response_body)
+        response_data.update(response_body_data if response_body_data else {})
+
+        paths[path][method]["responses"][status_str] = response_data